@@ -8,32 +8,36 @@ opens them in an editor and cleans up when the editor exits if possible.
 Usage:
     quick_configs.py
     quick_configs.py --editor "code --wait"
+    quick_configs.py --readme
 """
 
 import argparse
 import os
+import select
 import shlex
 import subprocess
 import sys
 import tempfile
 from pathlib import Path
 
+HOME = os.path.expanduser("~")
+
 # ---------------------------------------------------------------------
 # Configuration: Add or modify entries here
 # Format: (source_path, target_name_inside_tempdir)
 CONFIG_FILES = [
-    ("$HOME/.config/illogical-impulse/config.json", "illogical-impulse_config.json"),
-    ("$HOME/.config/hypr/custom", "hypr_custom"),
-    ("$HOME/.config/hypr/hyprland", "hypr_defaults_dont_edit"),
-    ("$HOME/.config/hypr/hyprlock.conf", "hyprlock.conf"),
-    ("$HOME/.config/hypr/hypridle.conf", "hypridle.conf"),
-    ("$HOME/.config/hypr/hyprland.conf", "hyprland.conf"),
-    ("$HOME/.config/hypr/monitors.conf", "monitors.conf"),
-    ("$HOME/.config/hypr/workspaces.conf", "workspaces.conf"),
-    ("$HOME/.config/fish/config.fish", "fish_config.fish"),
-    ("$HOME/.bashrc", "bashrc"),
-    ("$HOME/.zshrc", "zshrc"),
-    ("$HOME/.bash_aliases", "bash_aliases"),
+    (f"{HOME}/.config/illogical-impulse/config.json", "illogical-impulse_config.json"),
+    (f"{HOME}/.config/hypr/custom", "hypr_custom"),
+    (f"{HOME}/.config/hypr/hyprland", "hypr_defaults_dont_edit"),
+    (f"{HOME}/.config/hypr/hyprlock.conf", "hyprlock.conf"),
+    (f"{HOME}/.config/hypr/hypridle.conf", "hypridle.conf"),
+    (f"{HOME}/.config/hypr/hyprland.conf", "hyprland.conf"),
+    (f"{HOME}/.config/hypr/monitors.conf", "monitors.conf"),
+    (f"{HOME}/.config/hypr/workspaces.conf", "workspaces.conf"),
+    (f"{HOME}/.config/fish/config.fish", "fish_config.fish"),
+    (f"{HOME}/.bashrc", "bashrc"),
+    (f"{HOME}/.zshrc", "zshrc"),
+    (f"{HOME}/.bash_aliases", "bash_aliases"),
     # Add more here...
 ]
 # ---------------------------------------------------------------------
@@ -41,35 +45,36 @@ CONFIG_FILES = [
 DEFAULT_EDITOR = "code"
 
 
-def expand(path: str) -> Path:
-    """Expand ~ and environment variables cleanly."""
-    return Path(os.path.expandvars(os.path.expanduser(path)))
-
-
 def create_temp_workspace() -> Path:
     tempdir = Path(tempfile.mkdtemp(prefix="quick-configs-"))
     return tempdir
 
 
 def create_symlinks(tempdir: Path):
-    for src, target_name in CONFIG_FILES:
-        src_path = expand(src)
-        dest_path = tempdir / target_name
+    pairs = [(src, os.path.join(tempdir, target_name)) for src, target_name in CONFIG_FILES]
 
-        if not src_path.exists():
+    for src_path, dest_path in pairs:
+        try:
+            os.stat(src_path)
+        except OSError:
             print(f"WARNING: file does not exist and is skipped: {src_path}", file=sys.stderr)
             continue
 
-        dest_path.symlink_to(src_path)
+        try:
+            os.symlink(src_path, dest_path)
+        except OSError as e:
+            print(f"WARNING: could not link {src_path}: {e}", file=sys.stderr)
 
 
 def write_readme(tempdir: Path):
-    with open(tempdir / "README.md", "w") as f:
-        f.write("Temporary workspace created by quick_configs.py.\n")
-        f.write("It contains symlinks to config files for quick editing.\n\n")
-        f.write("Symlinked files:\n")
-        for p in sorted(tempdir.iterdir()):
-            f.write(f"- {p.name}\n")
+    names = sorted(e.name for e in os.scandir(tempdir))
+    content = (
+        "Temporary workspace created by quick_configs.py.\n"
+        "It contains symlinks to config files for quick editing.\n\n"
+        "Symlinked files:\n"
+        + "".join(f"- {name}\n" for name in names)
+    )
+    (tempdir / "README.md").write_text(content)
 
 
 def parse_editor_cmd(cmd: str, folder: Path):
@@ -94,6 +99,32 @@ def parse_editor_cmd(cmd: str, folder: Path):
         return parts + [str(folder)]
 
 
+def wait_for_editor(cmd) -> int:
+    """
+    Run the editor and block until it exits.
+    On Linux, wait on a pidfd with select() instead of waitpid; elsewhere use subprocess.run.
+    """
+    if not hasattr(os, "pidfd_open"):
+        return subprocess.run(cmd, check=False).returncode
+
+    proc = subprocess.Popen(cmd)
+    try:
+        try:
+            fd = os.pidfd_open(proc.pid)
+        except OSError:
+            # Kernel without pidfd support (< 5.3)
+            return proc.wait()
+        try:
+            select.select([fd], [], [])
+        finally:
+            os.close(fd)
+        return proc.wait()
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument(
@@ -101,6 +132,11 @@ def main():
         help='Editor command (e.g. "code --wait"). If not provided, defaults to VS Code when available.',
         default=None,
     )
+    parser.add_argument(
+        "--readme",
+        help="Also write a README.md listing the symlinked files into the workspace.",
+        action="store_true",
+    )
     args = parser.parse_args()
 
     # Determine editor command
@@ -110,7 +146,8 @@ def main():
     print(f"Created temporary workspace: {tempdir}")
 
     create_symlinks(tempdir)
-    write_readme(tempdir)
+    if args.readme:
+        write_readme(tempdir)
 
     # Prepare command array
     cmd = parse_editor_cmd(editor_cmd, tempdir)
@@ -124,17 +161,22 @@ def main():
     if blocking:
         # Editor will block → clean up afterwards
         try:
-            subprocess.run(cmd, check=False)
+            wait_for_editor(cmd)
         finally:
             import shutil
             shutil.rmtree(tempdir, ignore_errors=True)
             print(f"Workspace cleaned up: {tempdir}")
     else:
-        # Non-blocking → launch and leave folder in place
-        subprocess.Popen(cmd)
-        print("\nEditor launched in non-blocking mode.")
-        print(f"Temporary workspace preserved at:\n  {tempdir}\n")
+        # Non-blocking → nothing left to do here, so become the editor and leave folder in place
+        print("\nLaunching editor in non-blocking mode.")
+        print(f"Temporary workspace will be preserved at:\n  {tempdir}\n")
         print(f"Remove it manually with:\n  rm -rf '{tempdir}'\n")
+        sys.stdout.flush()
+        try:
+            os.execvp(cmd[0], cmd)
+        except OSError as e:
+            print(f"ERROR: could not launch editor {cmd[0]!r}: {e}", file=sys.stderr)
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -12,6 +12,7 @@ Example:
   smartfloat.py apply 0x56339236ac40 wallet
 
 Config file: ~/.config/hypr/smartfloat.conf
+Log file: ~/.cache/hypr/smartfloat.log (only written when SMARTFLOAT_DEBUG is set)
 Preset format:
 [rightfloat]
 width=25%
@@ -23,20 +24,44 @@ anchor=center
 """
 
 from __future__ import annotations
-import subprocess, json, re, os, sys, time, ast, math
-from typing import Optional, Dict
+# json/subprocess/ast are imported where used: `list` skips all three, and apply over the
+# socket only loads json (subprocess is the hyprctl fallback, ast the safe_eval fallback).
+# Preset is a NamedTuple rather than a dataclass for the same reason: dataclasses pulls in inspect/ast.
+import re, os, sys, time, socket, atexit
+from typing import Any, Dict, NamedTuple, Optional, Tuple
 
 HOME = os.environ.get("HOME", "~")
 LOGFILE = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(HOME, ".cache")), "hypr", "smartfloat.log")
 CFGFILE = os.path.join(os.environ.get("XDG_CONFIG_HOME", os.path.join(HOME, ".config")), "hypr", "smartfloat.conf")
-os.makedirs(os.path.dirname(LOGFILE), exist_ok=True)
+DEBUG = bool(os.environ.get("SMARTFLOAT_DEBUG"))
+
+# Hyprland request socket (same commands as hyprctl); None -> fall back to the hyprctl binary
+_HYPR_SIG = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+_XDG_RUNTIME = os.environ.get("XDG_RUNTIME_DIR")
+HYPR_SOCKET = os.path.join(_XDG_RUNTIME, "hypr", _HYPR_SIG, ".socket.sock") if _HYPR_SIG and _XDG_RUNTIME else None
+
+# Logging is off unless SMARTFLOAT_DEBUG is set; the file is opened once, line buffered
+_LOGFH = None
+if DEBUG:
+    os.makedirs(os.path.dirname(LOGFILE), exist_ok=True)
+    _LOGFH = open(LOGFILE, "a", buffering=1)
+    atexit.register(_LOGFH.close)
+
+# (second, formatted) - strftime only runs once per second of log output
+_LAST_TS = (0, "")
 
 def log(*parts):
+    global _LAST_TS
+    if not DEBUG:
+        return
+    now = int(time.time())
+    if now != _LAST_TS[0]:
+        _LAST_TS = (now, time.strftime('%F %T', time.localtime(now)))
     s = " ".join(str(p) for p in parts)
-    with open(LOGFILE, "a") as f:
-        f.write(f"[{time.strftime('%F %T')}] {s}\n")
+    _LOGFH.write(f"[{_LAST_TS[1]}] {s}\n")
 
 def run_cmd(args, capture=True):
+    import subprocess
     try:
         if capture:
             out = subprocess.check_output(args, stderr=subprocess.DEVNULL, text=True)
@@ -48,9 +73,40 @@ def run_cmd(args, capture=True):
         log("Command failed:", args, "->", e)
         return ""
 
+# Reply buffer reused across requests; grown in place if a reply (e.g. a long clients list) overflows it
+_RECV_BUF = bytearray(65536)
+_MSG_NOSIGNAL = getattr(socket, "MSG_NOSIGNAL", 0)
+
+def hypr_request(payload: str) -> Optional[str]:
+    """Send a raw request to Hyprland's socket and return the reply, or None if unavailable."""
+    if HYPR_SOCKET is None:
+        return None
+    try:
+        # Hyprland closes the connection after each reply, so a socket can't be reused across requests
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(HYPR_SOCKET)
+            # MSG_NOSIGNAL: a closed peer gives EPIPE instead of killing us with SIGPIPE
+            sock.sendall(payload.encode(), _MSG_NOSIGNAL)
+            total = 0
+            while True:
+                if total == len(_RECV_BUF):
+                    _RECV_BUF.extend(bytes(len(_RECV_BUF)))
+                n = sock.recv_into(memoryview(_RECV_BUF)[total:])
+                if not n:
+                    break
+                total += n
+        # decode straight from a view; slicing the bytearray would copy the reply first
+        return str(memoryview(_RECV_BUF)[:total], "utf-8")
+    except OSError as e:
+        log("Socket request failed:", payload, "->", e)
+        return None
+
 def hyprctl_json(kind: str):
-    """Call hyprctl -j <kind> (clients/monitors) and parse JSON."""
-    out = run_cmd(["hyprctl", "-j", kind])
+    """Query Hyprland for <kind> (clients/monitors) as JSON, via socket or hyprctl -j."""
+    import json
+    out = hypr_request(f"j/{kind}")
+    if out is None:
+        out = run_cmd(["hyprctl", "-j", kind])
     if not out:
         return []
     try:
@@ -59,27 +115,129 @@ def hyprctl_json(kind: str):
         log("JSON parse failed for hyprctl -j", kind, ":", e)
         return []
 
-def get_client(address_full: str):
-    clients = hyprctl_json("clients")
-    for c in clients:
-        if c.get("address") == address_full:
-            return c
-    return None
+class ClientCache:
+    """Per-run memo of hyprctl clients/monitors so one apply doesn't re-query for every step."""
 
-def get_monitor_by_id(mid):
-    mons = hyprctl_json("monitors")
-    for m in mons:
-        if m.get("id") == mid or str(m.get("id")) == str(mid):
-            return m
-    return None
+    def __init__(self):
+        self._clients_by_addr = None
+        self._monitors_by_id = None
+
+    def clients(self):
+        if self._clients_by_addr is None:
+            self._clients_by_addr = {c.get("address"): c for c in hyprctl_json("clients")}
+        return self._clients_by_addr
+
+    def monitors(self):
+        # keyed by str(id) so callers may pass the id as int or string
+        if self._monitors_by_id is None:
+            self._monitors_by_id = {str(m.get("id")): m for m in hyprctl_json("monitors")}
+        return self._monitors_by_id
+
+    def client(self, address_full: str):
+        return self.clients().get(address_full)
+
+    def monitor(self, mid):
+        return self.monitors().get(str(mid))
+
+    def invalidate_clients(self):
+        # Drop the cached client list after a dispatch changed window state (e.g. setfloating)
+        self._clients_by_addr = None
+
+def get_client(address_full: str, cache: Optional[ClientCache] = None):
+    return (cache or ClientCache()).client(address_full)
+
+def get_monitor_by_id(mid, cache: Optional[ClientCache] = None):
+    return (cache or ClientCache()).monitor(mid)
 
 # ---------- Safe arithmetic evaluator ----------
-# Accepts strings with numbers, operators + - * / and parentheses.
+# Accepts strings with numbers, operators + - * / // % ** and parentheses.
 # No names, no function calls, etc.
-ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Num, ast.Constant,
-                 ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd, ast.Mod, ast.FloorDiv, ast.LShift, ast.RShift)
-
-def safe_eval(expr: str) -> Optional[float]:
+_RE_ARITH_TOKEN = re.compile(r"\s*(?:(\d+(?:\.\d+)?)|(//|\*\*|[-+*/()%]))")
+
+def _tokenize_arith(s: str) -> list:
+    tokens = []
+    pos = 0
+    end = len(s.rstrip())
+    while pos < end:
+        m = _RE_ARITH_TOKEN.match(s, pos)
+        if not m:
+            raise ValueError(f"unexpected character at {pos}")
+        num, op = m.groups()
+        tokens.append(float(num) if num is not None else op)
+        pos = m.end()
+    return tokens
+
+def _eval_arith(s: str) -> float:
+    """Recursive-descent evaluator for plain arithmetic, using Python's operator precedence."""
+    tokens = _tokenize_arith(s)
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take():
+        nonlocal pos
+        tok = peek()
+        pos += 1
+        return tok
+
+    def expr():
+        val = term()
+        while peek() in ("+", "-"):
+            if take() == "+":
+                val += term()
+            else:
+                val -= term()
+        return val
+
+    def term():
+        val = unary()
+        while peek() in ("*", "/", "//", "%"):
+            op = take()
+            rhs = unary()
+            if op == "*":
+                val *= rhs
+            elif op == "/":
+                val /= rhs
+            elif op == "//":
+                val //= rhs
+            else:
+                val %= rhs
+        return val
+
+    def unary():
+        if peek() in ("+", "-"):
+            return -unary() if take() == "-" else unary()
+        return power()
+
+    def power():
+        base = atom()
+        if peek() == "**":
+            take()
+            return base ** unary()
+        return base
+
+    def atom():
+        tok = take()
+        if isinstance(tok, float):
+            return tok
+        if tok == "(":
+            val = expr()
+            if take() != ")":
+                raise ValueError("unbalanced parentheses")
+            return val
+        raise ValueError(f"unexpected token {tok!r}")
+
+    val = expr()
+    if pos != len(tokens):
+        raise ValueError(f"trailing token {peek()!r}")
+    return float(val)
+
+# Fallback for anything the mini-parser rejects (e.g. shifts): AST-whitelisted eval
+def _safe_eval_ast(expr: str) -> Optional[float]:
+    import ast
+    ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant,
+                     ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd, ast.Mod, ast.FloorDiv, ast.LShift, ast.RShift)
     try:
         node = ast.parse(expr, mode='eval')
     except Exception as e:
@@ -99,8 +257,34 @@ def safe_eval(expr: str) -> Optional[float]:
         log("safe_eval eval error:", expr, e)
         return None
 
+def safe_eval(expr: str) -> Optional[float]:
+    try:
+        return _eval_arith(expr)
+    except ValueError:
+        return _safe_eval_ast(expr)
+    except (ArithmeticError, TypeError, RecursionError) as e:
+        # RecursionError: absurdly nested input, e.g. 300 parentheses
+        log("safe_eval eval error:", expr, e)
+        return None
+
 # ---------- Expression to pixel computation ----------
-def compute_px(expr: str, axis: str, mon_dim: int, win_dim: int) -> Optional[int]:
+_RE_RIGHT = re.compile(r"right-([0-9]+(?:\.[0-9]+)?)%")
+_RE_BOTTOM = re.compile(r"bottom-([0-9]+(?:\.[0-9]+)?)%")
+_RE_PCT = re.compile(r"([0-9]+(?:\.[0-9]+)?)%")
+_RE_INT = re.compile(r"([0-9]+)")
+_RE_WIDTH = re.compile(r"\bwidth\b")
+_RE_HEIGHT = re.compile(r"\bheight\b")
+
+_RE_PCT_MINUS_WIN = re.compile(r"([0-9]+(?:\.[0-9]+)?)%\s*-\s*(?:width|height)")
+
+# Compiled expression: (kind, a, b)
+#   ("raw", px, 0)               -> px
+#   ("pct", f, 0)                -> f*mon_dim
+#   ("pct_minus_win", f, g)      -> f*mon_dim - g*win_dim
+#   ("expr", source, 0)          -> generic arithmetic, evaluated per call
+_CompiledExpr = Tuple[str, Any, Any]
+
+def _compile_expr(expr: Optional[str], axis: str) -> Optional[_CompiledExpr]:
     """
     expr examples:
       "50%" -> 50% of mon_dim
@@ -108,66 +292,97 @@ def compute_px(expr: str, axis: str, mon_dim: int, win_dim: int) -> Optional[int
       "right-5%" -> (mon_dim - win_dim) - 5%*mon_dim
       "120" -> raw px
       "width" -> win_dim
-    axis: "x" or "y" (affects interpretation of percentages if used specially)
+    axis: "x" or "y" (right-/bottom- shortcuts only apply on their own axis)
     """
-    if expr is None or expr == "":
+    if expr is None:
         return None
-
     expr = expr.strip()
+    if expr == "":
+        return None
 
-    # convenience: "width" or "height"
-    if expr == "width":
-        return int(win_dim)
-    if expr == "height":
-        return int(win_dim if axis == "x" else win_dim)  # caller should pass appropriate win_dim
+    # convenience: "width" or "height" (caller passes the matching win_dim)
+    if expr in ("width", "height"):
+        return ("pct_minus_win", 0.0, -1.0)
 
-    # right-5% and bottom-5% shortcuts
-    m = re.fullmatch(r"right-([0-9]+(?:\.[0-9]+)?)%", expr)
-    if m and axis == "x":
-        pct = float(m.group(1))
-        pct_px = pct / 100.0 * mon_dim
-        val = (mon_dim - win_dim) - pct_px
-        return int(round(val))
-
-    m = re.fullmatch(r"bottom-([0-9]+(?:\.[0-9]+)?)%", expr)
-    if m and axis == "y":
-        pct = float(m.group(1))
-        pct_px = pct / 100.0 * mon_dim
-        val = (mon_dim - win_dim) - pct_px
-        return int(round(val))
+    # If plain integer px
+    m = _RE_INT.fullmatch(expr)
+    if m:
+        return ("raw", int(m.group(1)), 0)
 
     # If expr is a plain percentage like "95%"
-    m = re.fullmatch(r"([0-9]+(?:\.[0-9]+)?)%", expr)
+    m = _RE_PCT.fullmatch(expr)
     if m:
-        pct = float(m.group(1))
-        return int(round(pct / 100.0 * mon_dim))
+        return ("pct", float(m.group(1)) / 100.0, 0.0)
 
-    # If plain integer px
-    m = re.fullmatch(r"([0-9]+)", expr)
+    # right-5% and bottom-5% shortcuts
+    m = (_RE_RIGHT if axis == "x" else _RE_BOTTOM).fullmatch(expr)
     if m:
-        return int(m.group(1))
+        return ("pct_minus_win", 1.0 - float(m.group(1)) / 100.0, 1.0)
 
+    m = _RE_PCT_MINUS_WIN.fullmatch(expr)
+    if m:
+        return ("pct_minus_win", float(m.group(1)) / 100.0, 1.0)
+
+    return ("expr", expr, 0)
+
+def _compute_generic(expr: str, mon_dim: int, win_dim: int) -> Optional[int]:
     # Generic expression: replace percentages with (N/100*mon_dim), replace 'width'/'height'
     tmp = expr
     # replace occurrences of NN% with (NN/100*mon_dim)
     def pct_repl(match):
         num = match.group(1)
         return f"({num}/100*{mon_dim})"
-    tmp = re.sub(r'([0-9]+(?:\.[0-9]+)?)%', pct_repl, tmp)
+    tmp = _RE_PCT.sub(pct_repl, tmp)
 
     # replace width/height with numbers
-    tmp = re.sub(r'\bwidth\b', str(win_dim), tmp)
-    tmp = re.sub(r'\bheight\b', str(win_dim), tmp)
+    tmp = _RE_WIDTH.sub(str(win_dim), tmp)
+    tmp = _RE_HEIGHT.sub(str(win_dim), tmp)
 
-    # allow minus sign without space, e.g. "95%-width" becomes "(95/100*mon_dim)-win_dim"
-    # safe_eval checks AST nodes so only arithmetic remains
+    # allow minus sign without space, e.g. "(100%-width)/2" becomes "((100/100*mon_dim)-win_dim)/2"
+    # safe_eval only accepts arithmetic
     val = safe_eval(tmp)
     if val is None:
         log("compute_px: failed safe eval for expr", expr, "-> transformed:", tmp)
         return None
     return int(round(val))
 
+def compute_px(expr, axis: str, mon_dim: int, win_dim: int) -> Optional[int]:
+    """Evaluate a preset expression (compiled, or a raw string) to pixels. See _compile_expr."""
+    if expr is None or isinstance(expr, str):
+        expr = _compile_expr(expr, axis)
+        if expr is None:
+            return None
+
+    kind, a, b = expr
+    if kind == "raw":
+        return a
+    if kind == "pct":
+        return int(round(a * mon_dim))
+    if kind == "pct_minus_win":
+        return int(round(a * mon_dim - b * win_dim))
+    return _compute_generic(a, mon_dim, win_dim)
+
 # ---------- Config loader ----------
+class Preset(NamedTuple):
+    """A merged preset with its expressions compiled (see _compile_expr)."""
+    width_expr: Optional[_CompiledExpr] = None
+    height_expr: Optional[_CompiledExpr] = None
+    x_expr: Optional[_CompiledExpr] = None
+    y_expr: Optional[_CompiledExpr] = None
+    anchor: Optional[str] = None
+    snap: bool = False
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, str]) -> "Preset":
+        return cls(
+            width_expr=_compile_expr(d.get("width"), "x"),
+            height_expr=_compile_expr(d.get("height"), "y"),
+            x_expr=_compile_expr(d.get("x"), "x"),
+            y_expr=_compile_expr(d.get("y"), "y"),
+            anchor=d.get("anchor"),
+            snap=d.get("snap", "").lower() == "true",
+        )
+
 def load_presets_from_cfg(path: str) -> Dict[str, Dict[str,str]]:
     presets = {}
     if not os.path.isfile(path):
@@ -178,16 +393,18 @@ def load_presets_from_cfg(path: str) -> Dict[str, Dict[str,str]]:
             line = raw.strip()
             if not line or line.startswith("#"):
                 continue
-            m = re.match(r'^\[(.+)\]$', line)
-            if m:
-                cur = m.group(1).strip()
+            if line.startswith("[") and line.endswith("]") and len(line) > 2:
+                cur = line[1:-1].strip()
                 presets[cur] = {}
                 continue
-            m = re.match(r'^([a-zA-Z0-9_]+)\s*=\s*(.+)$', line)
-            if m and cur:
-                k = m.group(1).strip().lower()
-                v = m.group(2).strip()
-                presets[cur][k] = v
+            if not cur or "=" not in line:
+                continue
+            k, v = line.split("=", 1)
+            k = k.rstrip()
+            v = v.strip()
+            # keys are [A-Za-z0-9_]+, values non-empty
+            if k and v and k.isascii() and k.replace("_", "").isalnum():
+                presets[cur][k.lower()] = v
     return presets
 
 # built-in presets (fallback)
@@ -197,33 +414,62 @@ BUILTIN_PRESETS = {
     "center": {"anchor":"center"}
 }
 
-def list_presets(cfg_presets):
-    names = set()
-    names.update(BUILTIN_PRESETS.keys())
-    names.update(cfg_presets.keys())
-    for n in sorted(names):
+def build_presets(cfg_presets: Dict[str, Dict[str,str]]) -> Dict[str, Preset]:
+    """Merge cfg presets over the builtins (per key) and compile each one once."""
+    merged = {name: dict(p) for name, p in BUILTIN_PRESETS.items()}
+    for name, p in cfg_presets.items():
+        merged.setdefault(name, {}).update(p)
+    return {name: Preset.from_dict(p) for name, p in merged.items()}
+
+def list_presets(presets: Dict[str, Any]):
+    for n in sorted(presets):
         print(n)
 
 # ---------- Hyprctl dispatcher helpers ----------
 def hypr_dispatch(cmd_parts: list):
     # cmd_parts: list of args after "hyprctl dispatch", e.g. ["setfloating", "address:0x..."]
+    if hypr_request(" ".join(["dispatch"] + cmd_parts)) is not None:
+        return
     args = ["hyprctl", "dispatch"] + cmd_parts
     # For commands where we pass a comma-separated argument e.g. resizewindowpixel exact 100 200,"address:0x..."
     # We will call via subprocess.run to avoid shell parsing issues
+    import subprocess
     try:
         subprocess.run(args, stderr=subprocess.DEVNULL)
     except Exception as e:
         log("hypr_dispatch failed:", args, e)
 
+def hypr_batch(cmds: list):
+    """Run several dispatches (each a cmd_parts list, see hypr_dispatch) in one round-trip."""
+    if not cmds:
+        return
+    lines = [" ".join(["dispatch"] + parts) for parts in cmds]
+    if hypr_request("[[BATCH]]" + ";".join(lines)) is not None:
+        return
+    hypr_exec_list(["--batch", " ; ".join(lines)])
+
 def hypr_exec_list(args_list):
     # convenience for commands that are simple lists of args (rarely used)
+    import subprocess
     try:
         subprocess.run(["hyprctl"] + args_list, stderr=subprocess.DEVNULL)
     except Exception as e:
         log("hypr_exec_list failed", args_list, e)
 
 # ---------- Main apply flow ----------
-def apply_preset(address_in: str, preset_name: str, cfg_presets):
+# anchor -> position on that axis, given (mon_pos, mon_dim, win_dim)
+_ANCHOR_X = {
+    "left": lambda mx, mw, ww: mx,
+    "right": lambda mx, mw, ww: mx + mw - ww,
+    "center": lambda mx, mw, ww: mx + (mw // 2) - (ww // 2),
+}
+_ANCHOR_Y = {
+    "top": lambda my, mh, wh: my,
+    "bottom": lambda my, mh, wh: my + mh - wh,
+    "center": lambda my, mh, wh: my + (mh // 2) - (wh // 2),
+}
+
+def apply_preset(address_in: str, preset_name: str, presets: Dict[str, Preset]):
     # normalize address to start with 0x
     addr = address_in.lower()
     if not addr.startswith("0x"):
@@ -231,13 +477,14 @@ def apply_preset(address_in: str, preset_name: str, cfg_presets):
 
     log(f"smartfloat apply: addr={addr} preset={preset_name}")
 
-    client = get_client(addr)
+    cache = ClientCache()
+    client = get_client(addr, cache)
     if not client:
         log("Client not found for address", addr)
         return
 
     mon_id = client.get("monitor")
-    mon = get_monitor_by_id(mon_id)
+    mon = get_monitor_by_id(mon_id, cache)
     if not mon:
         log("Monitor not found for id", mon_id)
         return
@@ -247,120 +494,103 @@ def apply_preset(address_in: str, preset_name: str, cfg_presets):
     mon_w = int(mon.get("width", 0))
     mon_h = int(mon.get("height", 0))
 
-    # Merge preset: cfg overrides builtin
-    preset = {}
-    if preset_name in BUILTIN_PRESETS:
-        preset.update(BUILTIN_PRESETS[preset_name])
-    if preset_name in cfg_presets:
-        preset.update(cfg_presets[preset_name])
-
+    # Unknown names get an empty preset: the window is just floated in place
+    preset = presets.get(preset_name, Preset())
     log("Using preset:", preset)
 
-    # Ensure floating
-    hypr_dispatch(["setfloating", f"address:{addr}"])
-    # small sleep to let Hyprland update
-    time.sleep(0.04)
+    # Window geometry we can't derive from the preset has to come from Hyprland.
+    # Floating a tiled window gives it its last floating size and a new position,
+    # so only then do we float it up front and re-query; otherwise everything
+    # goes in one batch.
+    has_x = preset.x_expr is not None or preset.anchor in _ANCHOR_X
+    has_y = preset.y_expr is not None or preset.anchor in _ANCHOR_Y
+    needs_live_geometry = not (preset.width_expr is not None and preset.height_expr is not None
+                               and has_x and has_y)
+
+    batch = []
+    if not client.get("floating"):
+        if needs_live_geometry:
+            hypr_dispatch(["setfloating", f"address:{addr}"])
+            # No wait needed: the socket reply is only sent after the dispatcher ran, and clients reports goal geometry
+            cache.invalidate_clients()
+            client = get_client(addr, cache)
+            if not client:
+                log("Client disappeared after floating")
+                return
+        else:
+            batch.append(["setfloating", f"address:{addr}"])
 
-    # Resize if width/height provided
-    W_px = None
-    H_px = None
-    if "width" in preset:
-        W_px = compute_px(preset["width"], "x", mon_w, client.get("size", [0,0])[0])
-    if "height" in preset:
-        H_px = compute_px(preset["height"], "y", mon_h, client.get("size", [0,0])[1])
-
-    # If only one axis provided, use current window size for the other
-    # Refresh client info first
-    client = get_client(addr)
-    if not client:
-        log("Client disappeared after floating")
-        return
+    cur_x = int(client.get("at", [0,0])[0])
+    cur_y = int(client.get("at", [0,0])[1])
     cur_w = int(client.get("size", [0,0])[0])
     cur_h = int(client.get("size", [0,0])[1])
+
+    # Resize if width/height provided; otherwise keep the current size for that axis
+    W_px = None
+    H_px = None
+    if preset.width_expr is not None:
+        W_px = compute_px(preset.width_expr, "x", mon_w, cur_w)
+    if preset.height_expr is not None:
+        H_px = compute_px(preset.height_expr, "y", mon_h, cur_h)
     if W_px is None:
         W_px = cur_w
     if H_px is None:
         H_px = cur_h
 
-    if W_px is not None and H_px is not None:
-        log(f"Resizing to {W_px}x{H_px}px")
-        # hyprctl expects arguments like: resizewindowpixel exact <W> <H>,"address:0x..."
-        # We'll call hyprctl dispatch with a single string after converting
-        # Build the argument string as hyprctl expects it (without shell)
-        # Because hyprctl 'dispatch' passes words, we'll pass the comma-delimited final arg as one item
-        arglist = ["resizewindowpixel", "exact", str(W_px), f"{H_px},address:{addr}"]
-        hypr_dispatch(arglist)
-        time.sleep(0.03)
-    else:
-        log("No resize requested")
+    log(f"Resizing to {W_px}x{H_px}px")
+    # hyprctl expects arguments like: resizewindowpixel exact <W> <H>,"address:0x..."
+    # Because hyprctl 'dispatch' passes words, we'll pass the comma-delimited final arg as one item
+    batch.append(["resizewindowpixel", "exact", str(W_px), f"{H_px},address:{addr}"])
 
-    # Refresh client geometry after resize
-    client = get_client(addr)
-    if not client:
-        log("Client vanished after resize")
-        return
-    win_w = int(client.get("size", [0,0])[0])
-    win_h = int(client.get("size", [0,0])[1])
+    # Geometry after resize is what we just asked for; no need to re-query
+    win_w = W_px
+    win_h = H_px
 
     # Determine move
     final_x = None
     final_y = None
 
-    if "x" in preset:
-        px = compute_px(preset["x"], "x", mon_w, win_w)
+    if preset.x_expr is not None:
+        px = compute_px(preset.x_expr, "x", mon_w, win_w)
         if px is not None:
             final_x = mon_x + int(px)
-    elif preset.get("anchor") in ("left","right","center"):
-        if preset["anchor"] == "left":
-            final_x = mon_x
-        elif preset["anchor"] == "right":
-            final_x = mon_x + mon_w - win_w
-        elif preset["anchor"] == "center":
-            final_x = mon_x + (mon_w // 2) - (win_w // 2)
-
-    if "y" in preset:
-        py = compute_px(preset["y"], "y", mon_h, win_h)
+    else:
+        fn = _ANCHOR_X.get(preset.anchor)
+        if fn:
+            final_x = fn(mon_x, mon_w, win_w)
+
+    if preset.y_expr is not None:
+        py = compute_px(preset.y_expr, "y", mon_h, win_h)
         if py is not None:
             final_y = mon_y + int(py)
-    elif preset.get("anchor") in ("top","bottom","center"):
-        if preset["anchor"] == "top":
-            final_y = mon_y
-        elif preset["anchor"] == "bottom":
-            final_y = mon_y + mon_h - win_h
-        elif preset["anchor"] == "center":
-            final_y = mon_y + (mon_h // 2) - (win_h // 2)
-
-    if final_x is None and final_y is None:
-        log("No move requested")
     else:
-        # fallback to current coordinates if one axis empty
-        cur_x = int(client.get("at", [0,0])[0])
-        cur_y = int(client.get("at", [0,0])[1])
-        if final_x is None:
-            final_x = cur_x
-        if final_y is None:
-            final_y = cur_y
+        fn = _ANCHOR_Y.get(preset.anchor)
+        if fn:
+            final_y = fn(mon_y, mon_h, win_h)
+
+    move_requested = final_x is not None or final_y is not None
+    # fallback to current coordinates if one axis empty
+    if final_x is None:
+        final_x = cur_x
+    if final_y is None:
+        final_y = cur_y
+
+    # Snapping/clamping if requested: clamp the target rect before dispatching
+    if preset.snap:
+        nx = max(mon_x, min(final_x, mon_x + mon_w - win_w))
+        ny = max(mon_y, min(final_y, mon_y + mon_h - win_h))
+        if nx != final_x or ny != final_y:
+            log(f"Snapping to NX={nx} NY={ny}")
+            final_x, final_y = nx, ny
+            move_requested = True
+
+    if move_requested:
         log(f"Moving to X={final_x} Y={final_y}")
-        arglist = ["movewindowpixel", "exact", str(final_x), f"{final_y},address:{addr}"]
-        hypr_dispatch(arglist)
-        time.sleep(0.02)
+        batch.append(["movewindowpixel", "exact", str(final_x), f"{final_y},address:{addr}"])
+    else:
+        log("No move requested")
 
-    # Snapping/clamping if requested
-    snap = preset.get("snap", "").lower() == "true"
-    if snap:
-        client = get_client(addr)
-        if not client:
-            log("Client vanished before snap")
-            return
-        cx = int(client.get("at", [0,0])[0])
-        cy = int(client.get("at", [0,0])[1])
-        cw = int(client.get("size", [0,0])[0])
-        ch = int(client.get("size", [0,0])[1])
-        nx = max(mon_x, min(cx, mon_x + mon_w - cw))
-        ny = max(mon_y, min(cy, mon_y + mon_h - ch))
-        if nx != cx or ny != cy:
-            log(f"Snapping to NX={nx} NY={ny}")
-            hypr_dispatch(["movewindowpixel","exact", str(nx), f"{ny},address:{addr}"])
+    hypr_batch(batch)
     log("smartfloat apply done for", addr, "preset", preset_name)
 
 # ---------- CLI ----------
@@ -369,13 +599,14 @@ def main():
         print(__doc__)
         sys.exit(1)
     cmd = sys.argv[1]
-    cfg_presets = load_presets_from_cfg(CFGFILE)
     if cmd == "list":
-        list_presets(cfg_presets)
+        # names only: no need to compile anything
+        list_presets({**BUILTIN_PRESETS, **load_presets_from_cfg(CFGFILE)})
     elif cmd == "info":
         if len(sys.argv) < 3:
             print("info requires address")
             sys.exit(1)
+        import json
         addr = sys.argv[2]
         if not addr.startswith("0x"):
             addr = "0x" + addr
@@ -387,10 +618,8 @@ def main():
             sys.exit(1)
         addr = sys.argv[2]
         preset = sys.argv[3]
-        # allow calling with or without 0x
-        if not addr.startswith("0x"):
-            addr = addr
-        apply_preset(addr, preset, cfg_presets)
+        # apply_preset adds the 0x prefix if missing
+        apply_preset(addr, preset, build_presets(load_presets_from_cfg(CFGFILE)))
     else:
         print("Unknown command", cmd)
         sys.exit(1)